@@ -1,6 +1,6 @@
 import os
 import pytest
-import requests
+from tests.test_helper import SESSION
 
 @pytest.fixture(scope="session")
 def maas_api_base_url() -> str:
@@ -20,7 +20,7 @@ def token(maas_api_base_url: str) -> str:
     free = os.popen("oc whoami -t").read().strip()
     if not free:
         raise RuntimeError("Could not obtain cluster token via `oc whoami -t`")
-    r = requests.post(
+    r = SESSION.post(
         f"{maas_api_base_url}/v1/tokens",
         headers={"Authorization": f"Bearer {free}", "Content-Type": "application/json"},
         json={"expiration": "10m"},
@@ -37,7 +37,7 @@ def headers(token: str):
 
 @pytest.fixture(scope="session")
 def model_catalog(maas_api_base_url: str, headers: dict):
-    r = requests.get(f"{maas_api_base_url}/v1/models", headers=headers, timeout=45, verify=False)
+    r = SESSION.get(f"{maas_api_base_url}/v1/models", headers=headers, timeout=45, verify=False)
     r.raise_for_status()
     return r.json()
 
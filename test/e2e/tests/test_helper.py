@@ -1,25 +1,46 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 TIMEOUT = (45, 45)  # (connect, read)
 
+# One pooled session for the whole smoke run so every call to the MaaS API and
+# the model gateway reuses the same keep-alive TCP/TLS connections.
+# verify=False stays on each call: a Session-level value loses to
+# $REQUESTS_CA_BUNDLE, and clusters often use self-signed certs in CI
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=8,
+        # raise_on_status=False: hand back the last 5xx instead of a RetryError
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+
 def _post(url: str, payload: dict, headers: dict, timeout_sec: int = 45) -> requests.Response:
-    # Note: verify=False because clusters often use self-signed certs in CI
-    return requests.post(
+    return SESSION.post(
         url,
         headers=headers,
         json=payload,
         timeout=(timeout_sec, timeout_sec),
-        verify=False,
         stream=False,
+        verify=False,
     )
 
 def chat(prompt: str, model_v1: str, headers: dict, model_name: str):
     url = f"{model_v1}/chat/completions"
     body = {"model": model_name, "messages": [{"role": "user", "content": prompt}]}
-    return requests.post(url, headers=headers, json=body, timeout=30, verify=False)
+    return SESSION.post(url, headers=headers, json=body, timeout=30, verify=False)
 
 def completions(prompt: str, model_v1: str, headers: dict, model_name: str):
     url = f"{model_v1}/completions"
     body = {"model": model_name, "prompt": prompt, "max_tokens": 16}
-    return requests.post(url, headers=headers, json=body, timeout=30, verify=False)
+    return SESSION.post(url, headers=headers, json=body, timeout=30, verify=False)
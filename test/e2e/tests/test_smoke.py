@@ -1,7 +1,6 @@
 import logging
 import json
-import requests
-from tests.test_helper import chat, completions
+from tests.test_helper import SESSION, chat, completions
 
 log = logging.getLogger(__name__)
 
@@ -15,7 +14,7 @@ def test_healthz_or_404(maas_api_base_url: str):
     # Prefer /health, but tolerate /healthz on some envs
     for path in ("/health", "/healthz"):
         try:
-            r = requests.get(f"{maas_api_base_url}{path}", timeout=10, verify=False)
+            r = SESSION.get(f"{maas_api_base_url}{path}", timeout=10, verify=False)
             print(f"[health] GET {path} -> {r.status_code}")
             assert r.status_code in (200, 401, 404)
             return
@@ -31,7 +30,7 @@ def test_mint_token(maas_api_base_url: str):
     If 200 (rare), verify a 'token' is present.
     """
     url = f"{maas_api_base_url}/v1/tokens"
-    r = requests.post(url, json={"expiration": "1m"}, timeout=20, verify=False)
+    r = SESSION.post(url, json={"expiration": "1m"}, timeout=20, verify=False)
     msg = f"[token] POST {url} (no auth) -> {r.status_code}"
     log.info(msg); print(msg)
 
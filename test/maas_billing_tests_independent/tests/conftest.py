@@ -2,14 +2,21 @@
 Shared test helpers/fixtures for MaaS billing tests.
 
 What this file provides:
-- http(requests.Session)       -> respects REQUESTS_VERIFY and INGRESS_CA_PATH (default verify=True)
+- http(requests.Session)       -> respects REQUESTS_VERIFY and INGRESS_CA_PATH (default verify=True);
+                                  retries transient 5xx / Retry-After 429s
+- http_noretry                 -> same, without retries (for tests that count 429s)
 - base_url                     -> from $MAAS_API_BASE_URL (skips suite if not set)
 - model_name                   -> from $MODEL_NAME
-- bearer(token)                -> {"Authorization": f"Bearer <token>"}
+- model_url                    -> catalog URL for model_name (one /v1/models GET per session)
+- chat_body                    -> pre-serialized minimal chat/completions body (bytes)
+- bearer(token)                -> {"Authorization": f"Bearer <token>"} (cached, read-only)
 - ensure_free_key/ensure_premium_key:
     Try to mint a MaaS JWT via /v1/tokens or /tokens (with/without body).
     If minting isn't available, fall back to the OC token so tests still run.
+    The result is cached per OC token and re-minted shortly before it expires.
+- free_auth_headers            -> bearer(maas_key) + JSON content type
 - mint_maas_key/revoke_maas_key for explicit control in tests
+- parse_jwt(token)             -> unverified ParsedJwt(header, payload, signature), cached per token
 - parse_usage_headers()        -> reads x-odhu-usage-* headers
 - get_limit(env_name, fallback_key, default_val):
     env override -> cluster CR discovery (RLP/TRLP) -> default
@@ -17,8 +24,19 @@ What this file provides:
 """
 
 from __future__ import annotations
-import os, json, base64, subprocess
+import os, json, base64, subprocess, functools, time
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
 import pytest, requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # Optional: faster parsing of `oc get -o json` output when installed
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 # -------------------------- Env & constants --------------------------
 
@@ -31,11 +49,21 @@ USAGE_API_BASE   = os.getenv("USAGE_API_BASE", BASE_URL)
 # Optional custom CA for HTTPS clusters; not required for HTTP
 INGRESS_CA_PATH  = os.getenv("INGRESS_CA_PATH", "")
 
-USAGE_HEADERS = [
+# (connect, read) timeouts: MaaS API calls (/v1/tokens, /v1/models) answer fast,
+# only inference may legitimately take up to a minute
+MINT_TIMEOUT     = (3, 15)
+CHAT_TIMEOUT     = (3, 60)
+
+# Accepted status codes, shared so every test agrees on what "ok" means
+OK_2XX           = frozenset({200, 201})
+OK_DELETE        = frozenset({200, 202, 204})
+AUTH_FAIL        = frozenset({401, 403})
+
+USAGE_HEADERS = frozenset({
     "x-odhu-usage-input-tokens",
     "x-odhu-usage-output-tokens",
     "x-odhu-usage-total-tokens",
-]
+})
 
 def _env_bool(name: str, default: bool) -> bool:
     v = os.getenv(name)
@@ -55,8 +83,7 @@ def base_url():
 def model_name():
     return MODEL_NAME
 
-@pytest.fixture(scope="session")
-def http() -> requests.Session:
+def _new_session(max_retries) -> requests.Session:
     s = requests.Session()
     # Default verify=True; allow opt-out via env; allow custom CA path if provided
     verify_default = True
@@ -68,67 +95,150 @@ def http() -> requests.Session:
     else:
         verify = verify_env if verify_env is not None else verify_default
     s.verify = verify
+    # Room for the concurrent burst tests without urllib3 discarding connections
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=max_retries)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
     return s
 
+@pytest.fixture(scope="session")
+def http() -> Iterator[requests.Session]:
+    # Retry transient 5xx, and 429s that carry Retry-After, so one slow
+    # moment on the cluster doesn't fail a functional test. read=False: a POST
+    # that timed out may already have been minted/billed, so never resend it,
+    # and let the original ReadTimeout through.
+    s = _new_session(Retry(
+        total=3,
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=True,
+        allowed_methods=frozenset(["GET", "POST", "DELETE"]),
+        raise_on_status=False,
+    ))
+    yield s
+    s.close()
+
+@pytest.fixture(scope="session")
+def http_noretry() -> Iterator[requests.Session]:
+    # For the rate/token limit tests: they need to see every raw 429
+    s = _new_session(0)
+    yield s
+    s.close()
+
 # -------------------------- HTTP helpers -----------------------------
 
+def _body(r: requests.Response):
+    # Only try JSON when the server says so; gateway HTML/text errors stay text
+    if r.headers.get("content-type", "").startswith("application/json"):
+        try:
+            return r.json()
+        except Exception:
+            pass
+    return r.text
+
 def http_get(http: requests.Session, url: str, headers=None, timeout=60):
     r = http.get(url, headers=headers or {}, timeout=timeout)
-    try:
-        body = r.json()
-    except Exception:
-        body = r.text
-    return r.status_code, body, r
+    return r.status_code, _body(r), r
 
 def http_post(http: requests.Session, url: str, headers=None, json=None, data=None, timeout=60):
     r = http.post(url, headers=headers or {}, json=json, data=data, timeout=timeout)
-    try:
-        body = r.json()
-    except Exception:
-        body = r.text
-    return r.status_code, body, r
+    return r.status_code, _body(r), r
 
-def bearer(tok: str) -> dict:
-    return {"Authorization": f"Bearer {tok}"} if tok else {}
+@functools.lru_cache(maxsize=16)
+def bearer(tok: str) -> Mapping[str, str]:
+    # Built once per token and shared, so hand out a read-only view
+    return MappingProxyType({"Authorization": f"Bearer {tok}"} if tok else {})
 
 # -------------------------- Token mint/revoke ------------------------
 
+_B64_PAD = "==="
+
+def _b64url_decode(s):
+    # urlsafe_b64decode takes ASCII str directly; pad only as far as needed
+    return base64.urlsafe_b64decode(s + _B64_PAD[:-len(s) & 3])
+
+@dataclass(frozen=True)
+class ParsedJwt:
+    header: dict
+    payload: dict
+    signature: bytes
+
+@functools.lru_cache(maxsize=256)
+def parse_jwt(token: str) -> ParsedJwt:
+    """Unverified JWT parts; split, decoded and JSON-parsed once per token."""
+    header, payload, signature = token.split(".")
+    return ParsedJwt(
+        header=json.loads(_b64url_decode(header)),
+        payload=json.loads(_b64url_decode(payload)),
+        signature=_b64url_decode(signature),
+    )
+
 def _looks_like_jwt(tok: str) -> bool:
     parts = tok.split(".")
     if len(parts) != 3:
         return False
     try:
-        base64.urlsafe_b64decode(parts[0] + "===")
-        base64.urlsafe_b64decode(parts[1] + "===")
+        _b64url_decode(parts[0])
+        _b64url_decode(parts[1])
         return True
     except Exception:
         return False
 
+# base_url -> (endpoint, body index) of the variant that last minted successfully
+_MINT_CACHE: dict[str, tuple[str, int]] = {}
+
+# OC token -> (key, exp) handed out by ensure_*_key; dropped again by revoke_maas_key.
+# exp is None when the key is the OC token itself (no JWT expiry to track).
+_KEY_CACHE: dict[str, tuple[str, float | None]] = {}
+
+# Re-mint a cached key once it has less than this many seconds left
+_KEY_MIN_TTL = 60
+
+def _post_mint(http: requests.Session, url: str, oc_user_token: str, body):
+    """POST one mint variant; returns (response or None, token or None)."""
+    try:
+        r = http.post(url, headers=bearer(oc_user_token), json=body, timeout=MINT_TIMEOUT)
+    except Exception:
+        return None, None
+    if r.status_code in OK_2XX:
+        try:
+            j = r.json()
+            return r, j.get("token") or j.get("access_token")
+        except Exception:
+            pass
+    return r, None
+
 def _try_mint_maas_key(http: requests.Session, base_url: str, oc_user_token: str, minutes=10) -> str | None:
     """
     Try several permutations commonly seen across clusters:
     - POST /v1/tokens and /tokens
     - with bodies: {"ttl": "10m"}, {"expiration": "10m"}, {}, and no body
+    The first variant that works is remembered per base_url, so later mints
+    in the session cost a single POST.
     Return the minted token or None if not available.
     """
+    base = base_url.rstrip("/")
     eps = ["/v1/tokens", "/tokens"]
     bodies = [{"ttl": f"{minutes}m"}, {"expiration": f"{minutes}m"}, {}, None]
+
+    cached = _MINT_CACHE.get(base)
+    if cached:
+        ep, i = cached
+        _, tok = _post_mint(http, f"{base}{ep}", oc_user_token, bodies[i])
+        if tok:
+            return tok
+
     for ep in eps:
-        url = f"{base_url.rstrip('/')}{ep}"
-        for body in bodies:
-            try:
-                r = http.post(url, headers=bearer(oc_user_token), json=body, timeout=60)
-            except Exception:
+        url = f"{base}{ep}"
+        for i, body in enumerate(bodies):
+            if (ep, i) == cached:
                 continue
-            if r.status_code in (200, 201):
-                try:
-                    j = r.json()
-                    tok = j.get("token") or j.get("access_token")
-                    if tok:
-                        return tok
-                except Exception:
-                    pass
-            if r.status_code in (404, 405):
+            r, tok = _post_mint(http, url, oc_user_token, body)
+            if tok:
+                _MINT_CACHE[base] = (ep, i)
+                return tok
+            if r is not None and r.status_code in (404, 405):
                 # endpoint not present or method not allowed → try next ep
                 break
     return None
@@ -141,68 +251,119 @@ def mint_maas_key(http: requests.Session, base_url: str, oc_user_token: str, min
 
 def revoke_maas_key(http: requests.Session, base_url: str, oc_user_token: str, token: str | None = None):
     # Some clusters revoke by calling DELETE on the token endpoint (token not always needed)
+    # Revocation is per user, so any key cached for this OC token is now dead.
+    _KEY_CACHE.pop(oc_user_token, None)
     last = None
     for ep in ("/v1/tokens", "/tokens"):
         url = f"{base_url.rstrip('/')}{ep}"
         try:
-            last = http.delete(url, headers=bearer(oc_user_token), timeout=60)
+            last = http.delete(url, headers=bearer(oc_user_token), timeout=MINT_TIMEOUT)
         except Exception:
             continue
-        if last.status_code in (200, 202, 204):
+        if last.status_code in OK_DELETE:
             return last
     return last
 
-def ensure_free_key(http: requests.Session) -> str:
+def _jwt_exp(tok: str) -> float | None:
+    try:
+        return float(parse_jwt(tok).payload["exp"])
+    except Exception:
+        return None
+
+def _mint_or_cached(oc_user_token: str, http: requests.Session) -> str:
+    # Keyed on the OC token only: the session, model or test parametrization
+    # never change which key a user gets.
+    cached = _KEY_CACHE.get(oc_user_token)
+    if cached:
+        key, exp = cached
+        # A long rate/token-limit run can outlast a 10-minute key
+        if exp is None or exp - time.time() > _KEY_MIN_TTL:
+            return key
+    minted = _try_mint_maas_key(http, BASE_URL, oc_user_token, minutes=10)
+    if minted and _looks_like_jwt(minted):
+        key, exp = minted, _jwt_exp(minted)
+    else:
+        key, exp = oc_user_token, None
+    _KEY_CACHE[oc_user_token] = (key, exp)
+    return key
+
+def ensure_free_key(http: requests.Session, oc: str = FREE_OC_TOKEN) -> str:
     """
     Preferred: a minted MaaS JWT. Fallback: the OC token (if cluster accepts Bearer OC).
+    Cached per OC token until it nears expiry or revoke_maas_key is called.
     """
-    assert FREE_OC_TOKEN, "FREE_OC_TOKEN not set (export your current user's oc token)"
+    assert oc, "FREE_OC_TOKEN not set (export your current user's oc token)"
     assert BASE_URL, "MAAS_API_BASE_URL not set"
-    minted = _try_mint_maas_key(http, BASE_URL, FREE_OC_TOKEN, minutes=10)
-    if minted and _looks_like_jwt(minted):
-        return minted
-    return FREE_OC_TOKEN
+    return _mint_or_cached(oc, http)
 
-def ensure_premium_key(http: requests.Session) -> str:
+def ensure_premium_key(http: requests.Session, oc: str = PREMIUM_OC_TOKEN) -> str:
     """
     Preferred: a minted MaaS JWT. Fallback: the OC token (if cluster accepts Bearer OC).
+    Cached per OC token until it nears expiry or revoke_maas_key is called.
     """
-    assert PREMIUM_OC_TOKEN, "PREMIUM_OC_TOKEN not set (export your premium user's oc token)"
+    assert oc, "PREMIUM_OC_TOKEN not set (export your premium user's oc token)"
     assert BASE_URL, "MAAS_API_BASE_URL not set"
-    minted = _try_mint_maas_key(http, BASE_URL, PREMIUM_OC_TOKEN, minutes=10)
-    if minted and _looks_like_jwt(minted):
-        return minted
-    return PREMIUM_OC_TOKEN
+    return _mint_or_cached(oc, http)
 
+# Function-scoped on purpose: it reads the per-user key cache, so every test
+# reuses one minted key, but a test that runs after revoke_maas_key gets a
+# fresh key instead of a session-pinned revoked one.
 @pytest.fixture
 def maas_key(http: requests.Session):
     return ensure_free_key(http)
 
+@pytest.fixture
+def free_auth_headers(maas_key: str) -> dict:
+    return {**bearer(maas_key), "Content-Type": "application/json"}
+
+@pytest.fixture(scope="session")
+def model_url(http: requests.Session, base_url: str, model_name: str) -> str:
+    """The catalog's URL for MODEL_NAME, looked up once per session."""
+    r = http.get(f"{base_url}/v1/models", headers=bearer(ensure_free_key(http)), timeout=MINT_TIMEOUT)
+    assert r.status_code == 200, f"/v1/models failed: {r.status_code} {r.text[:200]}"
+    body = r.json()
+    items = body.get("data") or body.get("models") or []
+    target = next((m for m in items if m.get("id") == model_name or m.get("name") == model_name), None)
+    assert target and target.get("url"), f"model {model_name!r} not found or missing url"
+    return target["url"]
+
+@pytest.fixture(scope="session")
+def chat_body(model_name: str) -> bytes:
+    """Minimal chat/completions request, serialized once; send with data=."""
+    return json.dumps({
+        "model": model_name,
+        "messages": [{"role": "user", "content": "Say hi"}],
+        "temperature": 0,
+    }).encode()
+
 # -------------------------- Usage headers helper ---------------------
 
+def _coerce_int(v):
+    try:
+        return int(v)
+    except Exception:
+        return v
+
 def parse_usage_headers(resp) -> dict:
-    out = {}
-    for h in USAGE_HEADERS:
-        v = resp.headers.get(h) or resp.headers.get(h.title())
-        if v is not None:
-            try:
-                out[h] = int(v)
-            except Exception:
-                out[h] = v
-    return out
+    # resp.headers is a CaseInsensitiveDict, so one lookup per header is enough
+    return {h: _coerce_int(v) for h in USAGE_HEADERS if (v := resp.headers.get(h)) is not None}
 
 # -------------------------- Cluster policy discovery -----------------
 
-def _get_json(ns: str, kind: str, name: str):
+def _oc_get_json(*args: str):
     try:
+        # Keep stdout as bytes; both parsers accept it without a decode step
         out = subprocess.run(
-            ["oc", "-n", ns, "get", kind, name, "-o", "json"],
-            capture_output=True, text=True, check=True
+            ["oc", "get", *args, "-o", "json"],
+            capture_output=True, check=True
         ).stdout
-        return json.loads(out)
+        return _json_loads(out)
     except Exception:
         return {}
 
+def _get_json(ns: str, kind: str, name: str):
+    return _oc_get_json("-n", ns, kind, name)
+
 def _first_existing(ns: str, kinds: list[str], name: str):
     for k in kinds:
         d = _get_json(ns, k, name)
@@ -210,20 +371,48 @@ def _first_existing(ns: str, kinds: list[str], name: str):
             return d
     return {}
 
+def _kuadrant_policies() -> dict | None:
+    """
+    Fetch both Kuadrant policy kinds with a single cluster-wide `oc get`,
+    keyed by (kind, namespace, name). None if the call failed (e.g. no
+    cluster-scope list RBAC, or one of the CRDs is not served).
+    """
+    try:
+        p = subprocess.run(
+            ["oc", "get", "ratelimitpolicies.kuadrant.io,tokenratelimitpolicies.kuadrant.io", "-A", "-o", "json"],
+            capture_output=True, check=True
+        )
+        items = _json_loads(p.stdout).get("items") or []
+    except Exception:
+        return None
+    out = {}
+    for item in items:
+        meta = item.get("metadata") or {}
+        out[(item.get("kind"), meta.get("namespace"), meta.get("name"))] = item
+    return out
+
 def policy_from_cluster():
-    # Try both API groups for each CRD
-    rlp = _first_existing(
-        "openshift-ingress",
-        ["ratelimitpolicies.gateway.networking.k8s.io",
-         "ratelimitpolicies.kuadrant.io"],
-        "gateway-rate-limits",
-    )
-    trlp = _first_existing(
-        "maas-api",
-        ["tokenratelimitpolicies.gateway.networking.k8s.io",
-         "tokenratelimitpolicies.kuadrant.io"],
-        "gateway-token-rate-limits",
-    )
+    found = _kuadrant_policies()
+    if found is not None:
+        # Common case: one oc call covers both policies. Note this takes the
+        # kuadrant.io kinds as authoritative; the per-group probes below tried
+        # *.gateway.networking.k8s.io first and are no longer consulted here.
+        rlp = found.get(("RateLimitPolicy", "openshift-ingress", "gateway-rate-limits"))
+        trlp = found.get(("TokenRateLimitPolicy", "maas-api", "gateway-token-rate-limits"))
+    else:
+        # Cluster-wide list failed: try both API groups for each CRD
+        rlp = _first_existing(
+            "openshift-ingress",
+            ["ratelimitpolicies.gateway.networking.k8s.io",
+             "ratelimitpolicies.kuadrant.io"],
+            "gateway-rate-limits",
+        )
+        trlp = _first_existing(
+            "maas-api",
+            ["tokenratelimitpolicies.gateway.networking.k8s.io",
+             "tokenratelimitpolicies.kuadrant.io"],
+            "gateway-token-rate-limits",
+        )
     return {
         "free_burst":     (rlp or {}).get("spec", {}).get("limits", {}).get("free", {}).get("rates", [{}])[0].get("limit"),
         "premium_burst":  (rlp or {}).get("spec", {}).get("limits", {}).get("premium", {}).get("rates", [{}])[0].get("limit"),
@@ -231,11 +420,14 @@ def policy_from_cluster():
         "premium_tokens": (trlp or {}).get("spec", {}).get("limits", {}).get("premium-user-tokens", {}).get("rates", [{}])[0].get("limit"),
     }
 
-POLICY = policy_from_cluster()
+@functools.lru_cache(maxsize=1)
+def _policy() -> dict:
+    # Looked up on first use instead of at import, so collection stays cheap
+    return policy_from_cluster()
 
 def get_limit(env_name: str, fallback_key: str, default_val):
     """
-    Prefer env override → then cluster policy (POLICY[fallback_key]) → default.
+    Prefer env override → then cluster policy (_policy()[fallback_key]) → default.
     Examples:
       get_limit("RATE_LIMIT_BURST_FREE", "free_burst", 16)
       get_limit("RATE_LIMIT_BURST_PREMIUM", "premium_burst", 32)
@@ -248,7 +440,7 @@ def get_limit(env_name: str, fallback_key: str, default_val):
             return int(v)
         except Exception:
             return default_val
-    return POLICY.get(fallback_key) or default_val
+    return _policy().get(fallback_key) or default_val
 
 # --- new: tool-calling -
 
@@ -4,10 +4,13 @@
 # Failures usually mean limits not applied or too high to trigger.
 
 import os, time, pytest
-from conftest import bearer, ensure_free_key, get_limit
+from conftest import CHAT_TIMEOUT, MINT_TIMEOUT, bearer, ensure_free_key, get_limit
+
+# Drains the shared per-user limits; keep out of parallel (xdist) runs
+pytestmark = pytest.mark.serial
 
 def _url(http, base_url, key, model_name):
-    r = http.get(f"{base_url}/v1/models", headers=bearer(key), timeout=30)
+    r = http.get(f"{base_url}/v1/models", headers=bearer(key), timeout=MINT_TIMEOUT)
     assert r.status_code == 200
     items = (r.json().get("data") or r.json().get("models") or [])
     m = next((m for m in items if m.get("id") == model_name or m.get("name") == model_name), None)
@@ -24,13 +27,13 @@ def _post(http, url, model, key, tokens):
             "max_tokens": tokens,
             "temperature": 0,
         },
-        timeout=60,
+        timeout=CHAT_TIMEOUT,
     )
 
 @pytest.mark.skipif(not os.getenv("FREE_OC_TOKEN"), reason="FREE_OC_TOKEN not set")
-def test_request_limit_before_token_limit(http, base_url, model_name):
-    key    = ensure_free_key(http)
-    url    = _url(http, base_url, key, model_name)
+def test_request_limit_before_token_limit(http_noretry, base_url, model_name):
+    key    = ensure_free_key(http_noretry)
+    url    = _url(http_noretry, base_url, key, model_name)
     burst  = get_limit("RATE_LIMIT_BURST", "free_burst", 16)
     budget = get_limit("TOKEN_LIMIT_FREE", "free_tokens", 1000)
 
@@ -39,7 +42,7 @@ def test_request_limit_before_token_limit(http, base_url, model_name):
     sleep_s  = float(os.getenv("BURST_SLEEP", "0.05"))
     codes    = []
     for _ in range(calls):
-        r = _post(http, url, model_name, key, per_call)
+        r = _post(http_noretry, url, model_name, key, per_call)
         codes.append(r.status_code)
         if r.status_code == 429:
             break
@@ -49,9 +52,9 @@ def test_request_limit_before_token_limit(http, base_url, model_name):
     # Optional sanity: cheap calls should not have crossed token budget first
 
 @pytest.mark.skipif(not os.getenv("FREE_OC_TOKEN"), reason="FREE_OC_TOKEN not set")
-def test_token_limit_before_request_limit(http, base_url, model_name):
-    key    = ensure_free_key(http)
-    url    = _url(http, base_url, key, model_name)
+def test_token_limit_before_request_limit(http_noretry, base_url, model_name):
+    key    = ensure_free_key(http_noretry)
+    url    = _url(http_noretry, base_url, key, model_name)
     burst  = get_limit("RATE_LIMIT_BURST", "free_burst", 16)
     budget = get_limit("TOKEN_LIMIT_FREE", "free_tokens", 1000)
 
@@ -60,7 +63,7 @@ def test_token_limit_before_request_limit(http, base_url, model_name):
     sleep_s  = float(os.getenv("BURST_SLEEP", "0.05"))
     codes    = []
     for _ in range(calls):
-        r = _post(http, url, model_name, key, per_call)
+        r = _post(http_noretry, url, model_name, key, per_call)
         codes.append(r.status_code)
         if r.status_code == 429:
             break
@@ -68,7 +71,7 @@ def test_token_limit_before_request_limit(http, base_url, model_name):
 
     # If budget wasn’t yet crossed, send one more to push it over
     if 429 not in codes:
-        r = _post(http, url, model_name, key, per_call)
+        r = _post(http_noretry, url, model_name, key, per_call)
         codes.append(r.status_code)
 
     assert any(c == 429 for c in codes), f"no 429 seen; codes={codes}"
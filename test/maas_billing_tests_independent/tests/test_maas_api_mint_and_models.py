@@ -4,13 +4,13 @@
 #    entry includes a usable endpoint/URL (or at least id/endpoint fields).
 # If these fail, the control-plane (token mint) or catalog (models/URLs) is broken.
 
-from conftest import bearer
+from conftest import MINT_TIMEOUT, bearer
 
 def test_mint_token(maas_key):
     assert isinstance(maas_key, str) and len(maas_key) > 100
 
 def test_list_models_exposes_urls(http, base_url, maas_key):
-    r = http.get(f"{base_url}/v1/models", headers=bearer(maas_key))
+    r = http.get(f"{base_url}/v1/models", headers=bearer(maas_key), timeout=MINT_TIMEOUT)
     assert r.status_code == 200, r.text[:200]
     j = r.json()
     data = j.get("data") or j.get("models") or []
@@ -18,15 +18,18 @@ If Premium were lower than Free, prem_ok < free_ok → FAIL.
 """
 
 import os, pytest, time
-from conftest import bearer, ensure_free_key, ensure_premium_key, get_limit
+from conftest import CHAT_TIMEOUT, MINT_TIMEOUT, OK_2XX, bearer, ensure_free_key, ensure_premium_key, get_limit
+
+# Drains the shared per-user limits; keep out of parallel (xdist) runs
+pytestmark = pytest.mark.serial
 
 @pytest.mark.skipif(not os.getenv("PREMIUM_OC_TOKEN"), reason="PREMIUM_OC_TOKEN not set")
-def test_free_vs_premium_quota(http, base_url, model_name):
-    free_key = ensure_free_key(http)
-    prem_key = ensure_premium_key(http)
+def test_free_vs_premium_quota(http_noretry, base_url, model_name):
+    free_key = ensure_free_key(http_noretry)
+    prem_key = ensure_premium_key(http_noretry)
 
     # Discover the model URL once (either key works)
-    models = http.get(f"{base_url}/v1/models", headers=bearer(free_key), timeout=30).json()
+    models = http_noretry.get(f"{base_url}/v1/models", headers=bearer(free_key), timeout=MINT_TIMEOUT).json()
     items = models.get("data") or models.get("models") or []
     target = next((m for m in items if m.get("id") == model_name or m.get("name") == model_name), None)
     assert target and target.get("url"), f"model {model_name!r} not found or missing 'url'"
@@ -51,7 +54,7 @@ def test_free_vs_premium_quota(http, base_url, model_name):
         ok = 0
         rl = 0
         for _ in range(N):
-            r = http.post(
+            r = http_noretry.post(
                 f"{model_url}/v1/chat/completions",
                 headers=bearer(key),
                 json={
@@ -60,9 +63,9 @@ def test_free_vs_premium_quota(http, base_url, model_name):
                     "max_tokens": per_call_tokens,
                     "temperature": 0,
                 },
-                timeout=60,
+                timeout=CHAT_TIMEOUT,
             )
-            if r.status_code in (200, 201):
+            if r.status_code in OK_2XX:
                 ok += 1
             elif r.status_code == 429:
                 rl += 1
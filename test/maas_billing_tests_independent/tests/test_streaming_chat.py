@@ -1,4 +1,5 @@
 import os, json, shlex, subprocess, pytest
+from conftest import MINT_TIMEOUT, OK_2XX
 
 # Enable extra logs in report/console when STREAMING_DEBUG=1|true|yes
 DEBUG = os.getenv("STREAMING_DEBUG", "false").lower() in ("1", "true", "yes")
@@ -14,13 +15,13 @@ def test_chat_completions_streaming(http, base_url, model_name):
         f"{base_url}/v1/tokens",
         headers={"Authorization": f"Bearer {oc_token}", "Content-Type": "application/json"},
         json={"expiration": "20m"},
-        timeout=30,
+        timeout=MINT_TIMEOUT,
     )
-    assert r.status_code in (200, 201), "Token mint failed"
+    assert r.status_code in OK_2XX, "Token mint failed"
     token = r.json()["token"]
 
     # 2) Discover model URL  ← make sure everything below is indented inside the function
-    r = http.get(f"{base_url}/v1/models", headers={"Authorization": f"Bearer {token}"}, timeout=30)
+    r = http.get(f"{base_url}/v1/models", headers={"Authorization": f"Bearer {token}"}, timeout=MINT_TIMEOUT)
     assert r.status_code == 200, "Models list failed"
     models = r.json()["data"]
     model_entry = next((m for m in models if m["id"] == model_name), None)
@@ -9,7 +9,10 @@
 # - If usage headers aren’t exposed, the test skips (can’t measure tokens).
 
 import os, time, pytest
-from conftest import bearer, ensure_free_key, get_limit
+from conftest import CHAT_TIMEOUT, MINT_TIMEOUT, OK_2XX, bearer, ensure_free_key, get_limit
+
+# Drains the shared per-user limits; keep out of parallel (xdist) runs
+pytestmark = pytest.mark.serial
 
 USAGE_HEADERS = (
     "x-odhu-usage-total-tokens",
@@ -18,7 +21,7 @@ USAGE_HEADERS = (
 )
 
 def _model_url(http, base_url, key, model_name):
-    r = http.get(f"{base_url}/v1/models", headers=bearer(key), timeout=30)
+    r = http.get(f"{base_url}/v1/models", headers=bearer(key), timeout=MINT_TIMEOUT)
     assert r.status_code == 200, f"/v1/models failed: {r.status_code} {r.text[:200]}"
     items = (r.json().get("data") or r.json().get("models") or [])
     hit = next((m for m in items if m.get("id") == model_name or m.get("name") == model_name), None)
@@ -38,9 +41,9 @@ def _tokens_used(h):
         return 0
 
 @pytest.mark.skipif(not os.getenv("FREE_OC_TOKEN"), reason="FREE_OC_TOKEN not set")
-def test_free_token_budget_enforced(http, base_url, model_name):
-    key = ensure_free_key(http)
-    url = _model_url(http, base_url, key, model_name)
+def test_free_token_budget_enforced(http_noretry, base_url, model_name):
+    key = ensure_free_key(http_noretry)
+    url = _model_url(http_noretry, base_url, key, model_name)
 
     # Pull limits from cluster, allow env override
     token_budget = get_limit("TOKEN_LIMIT_FREE", "free_tokens", 1000)
@@ -53,7 +56,7 @@ def test_free_token_budget_enforced(http, base_url, model_name):
 
     consumed, codes = 0, []
     for _ in range(calls):
-        r = http.post(
+        r = http_noretry.post(
             f"{url}/v1/chat/completions",
             headers=bearer(key),
             json={
@@ -62,17 +65,17 @@ def test_free_token_budget_enforced(http, base_url, model_name):
                 "max_tokens": per_call,
                 "temperature": 0,
             },
-            timeout=60,
+            timeout=CHAT_TIMEOUT,
         )
         codes.append(r.status_code)
-        if r.status_code in (200, 201):
+        if r.status_code in OK_2XX:
             if not any(h in r.headers for h in USAGE_HEADERS):
                 pytest.skip("Usage headers not present; token accounting disabled on this cluster.")
             consumed += _tokens_used(r.headers)
             if consumed >= token_budget:
                 # Fire one extra to observe 429 due to token limit
                 time.sleep(sleep_s)
-                r2 = http.post(
+                r2 = http_noretry.post(
                     f"{url}/v1/chat/completions",
                     headers=bearer(key),
                     json={
@@ -81,7 +84,7 @@ def test_free_token_budget_enforced(http, base_url, model_name):
                         "max_tokens": per_call,
                         "temperature": 0,
                     },
-                    timeout=60,
+                    timeout=CHAT_TIMEOUT,
                 )
                 codes.append(r2.status_code)
                 break
@@ -2,6 +2,7 @@ import os
 import json
 import subprocess, shlex
 import pytest
+from conftest import CHAT_TIMEOUT, MINT_TIMEOUT, OK_2XX
 
 def _parse_args(args_raw):
     if isinstance(args_raw, dict):
@@ -21,14 +22,14 @@ def test_tool_calling_forced(http, base_url, model_name, tools_spec):
         mint_url,
         headers={"Authorization": f"Bearer {oc_token}", "Content-Type": "application/json"},
         json={"expiration": "20m"},
-        timeout=30,
+        timeout=MINT_TIMEOUT,
     )
-    assert r.status_code in (200, 201), f"Token mint failed: {r.status_code} {r.text}"
+    assert r.status_code in OK_2XX, f"Token mint failed: {r.status_code} {r.text}"
     token = r.json()["token"]
 
     # 2️⃣ List models
     models_url = f"{base_url}/v1/models"
-    r = http.get(models_url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+    r = http.get(models_url, headers={"Authorization": f"Bearer {token}"}, timeout=MINT_TIMEOUT)
     assert r.status_code == 200, f"Models list failed: {r.status_code} {r.text}"
     models = r.json()["data"]
 
@@ -55,9 +56,9 @@ def test_tool_calling_forced(http, base_url, model_name, tools_spec):
         chat_url,
         headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
         json=payload,
-        timeout=60,
+        timeout=CHAT_TIMEOUT,
     )
-    assert r.status_code in (200, 201), f"Chat call failed: {r.status_code} {r.text}"
+    assert r.status_code in OK_2XX, f"Chat call failed: {r.status_code} {r.text}"
 
     data = r.json()
     msg = data["choices"][0]["message"]
@@ -89,14 +90,14 @@ def test_tool_calling_auto(http, base_url, model_name, tools_spec):
         mint_url,
         headers={"Authorization": f"Bearer {oc_token}", "Content-Type": "application/json"},
         json={"expiration": "20m"},
-        timeout=30,
+        timeout=MINT_TIMEOUT,
     )
-    assert r.status_code in (200, 201), f"Token mint failed: {r.status_code} {r.text}"
+    assert r.status_code in OK_2XX, f"Token mint failed: {r.status_code} {r.text}"
     token = r.json()["token"]
 
     # 2) Discover model URL (same as forced)
     models_url = f"{base_url}/v1/models"
-    r = http.get(models_url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+    r = http.get(models_url, headers={"Authorization": f"Bearer {token}"}, timeout=MINT_TIMEOUT)
     assert r.status_code == 200, f"Models list failed: {r.status_code} {r.text}"
     models = r.json()["data"]
     model_entry = next((m for m in models if m["id"] == model_name), None)
@@ -147,9 +148,9 @@ def test_tool_calling_auto(http, base_url, model_name, tools_spec):
         chat_url,
         headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
         json=payload,
-        timeout=60,
+        timeout=CHAT_TIMEOUT,
     )
-    assert r.status_code in (200, 201), f"Chat call failed: {r.status_code} {r.text}"
+    assert r.status_code in OK_2XX, f"Chat call failed: {r.status_code} {r.text}"
     data = r.json()
     msg = data["choices"][0]["message"]
     tool_calls = msg.get("tool_calls") or []